@@ -1,5 +1,7 @@
+import asyncio
 import json
 import socket
+from concurrent.futures import ThreadPoolExecutor
 from time import sleep
 
 import discord
@@ -24,10 +26,21 @@ class Bot(discord.Client):
 
         # Both bots are modeled in a single class and the corresponding behaviour is determined according to this
         self.bot_mode = bot_mode
+        self.logger = self.interface.logger
 
         self.encryption = Encryption(self.config)
         self.encryption.load_keys()
 
+        # Incoming messages are queued per author and processed by one worker task per author, so messages of the
+        # same author stay in order while different authors are handled in parallel
+        self.author_queues = {}
+        self.executor = ThreadPoolExecutor(max_workers=self.config.max_concurrent_messages)
+        self.message_semaphore = None
+
+        # Live messages are buffered while missed messages are fetched from the channel history in on_ready
+        self.caught_up = False
+        self.buffered_messages = []
+
         # A webhook is used to send messages to the channel
         # This is way easier and more performant than dealing with the asynchronous message sending of discord.Client
         if self.bot_mode == BotMode.TABLE_MODE:
@@ -47,17 +60,87 @@ class Bot(discord.Client):
         # Release the lock so the client can start interacting with the bot
         if self.interface.ready_lock.locked():
             self.interface.ready_lock.release()
+        self.interface.ready_event.set()
+
+        # Process messages that were send while this bot was not running or disconnected. The cursor is taken before
+        # the history is fetched, live messages arriving meanwhile are buffered and dispatched afterwards.
+        self.caught_up = False
+        high_water_mark = self.interface.last_message_id
+
+        if high_water_mark is not None:
+            channel = self.get_channel(self.config.secrets.text_channel_id)
+            missed = channel.history(limit=None, after=discord.Object(id=high_water_mark), oldest_first=True)
+
+            async for message in missed:
+                if self.is_relevant(message):
+                    self.dispatch_message(message)
+
+        # Messages contained in both the history and the buffer are skipped by the duplicate check
+        buffered, self.buffered_messages = self.buffered_messages, []
+        for message in buffered:
+            self.dispatch_message(message)
+        self.caught_up = True
 
     async def on_message(self, message: discord.Message):
 
+        if not self.is_relevant(message):
+            return
+
+        if not self.caught_up:
+            self.buffered_messages.append(message)
+            return
+
+        self.dispatch_message(message)
+
+    def is_relevant(self, message: discord.Message):
+
         # Restrict to channel
         if message.channel.id != self.config.secrets.text_channel_id:
-            return
+            return False
 
         # Ignore own messages
         if message.author.name == self.player_id:
+            return False
+
+        return True
+
+    def dispatch_message(self, message: discord.Message):
+
+        # Ignore messages that were already received, e.g. before a restart
+        if not self.interface.message_received(message.id):
             return
 
+        author = message.author.name
+
+        if author not in self.author_queues:
+            self.author_queues[author] = asyncio.Queue()
+            self.loop.create_task(self.process_author_queue(self.author_queues[author]))
+
+        self.author_queues[author].put_nowait(message)
+
+    async def process_author_queue(self, author_queue: asyncio.Queue):
+        # Created lazily so it is bound to the event loop the bot is running in
+        if self.message_semaphore is None:
+            self.message_semaphore = asyncio.Semaphore(self.config.max_concurrent_messages)
+
+        while True:
+            message = await author_queue.get()
+
+            async with self.message_semaphore:
+                try:
+                    # Decryption, the interface and sending the reply are blocking, so run them outside the loop
+                    await self.loop.run_in_executor(self.executor, self.process_message, message)
+                except Exception as e:
+                    self.logger.error('bot', 'message_processing_failed', author=message.author.name, error=repr(e))
+
+    def process_message(self, message: discord.Message):
+        try:
+            self.handle_received_message(message)
+        finally:
+            # Only now the message counts as handled, so it is processed again if the bot stops before
+            self.interface.message_handled(message.id)
+
+    def handle_received_message(self, message: discord.Message):
         content, valid_signature = self.decrypt(message.content, message.author.name)
 
         # Decrypt returns None if this client is not the intended recipient of the message
@@ -65,7 +148,7 @@ class Bot(discord.Client):
             return
 
         if not valid_signature:
-            print('Invalid signature for message from', message.author.name)
+            self.logger.error('bot', 'invalid_signature', author=message.author.name)
             return
 
         reply_content = self.interface.handle_message(content, message.author.name)
@@ -93,7 +176,8 @@ class Bot(discord.Client):
         signer = self.player_id
 
         if self.bot_mode == BotMode.PLAYER_MODE:
-            print(self.player_id + ' send: ' + str(message_content).strip())
+            self.logger.info('bot', 'send', sample_key=lambda: self.sample_key(message_content), sender=self.player_id,
+                             recipient=recipient, content=message_content)
 
         # Can be used to simulate a faked signature:
         # For will look like Player1 tried to fake a message for this player (self.player_id)
@@ -107,6 +191,20 @@ class Bot(discord.Client):
                           username=self.player_id,
                           avatar_url=self.user.avatar_url)
 
+    @staticmethod
+    def sample_key(message_content):
+        """
+        Returns the method of a request, which is used as sample key when logging, e.g. to sample status polls.
+        None is returned for messages that aren't requests, e.g. replies of the table.
+        """
+
+        try:
+            msg_dict = json.loads(str(message_content).strip().replace('\'', '"'))
+        except ValueError:
+            return None
+
+        return msg_dict.get('method') if isinstance(msg_dict, dict) else None
+
     def run(self, *args, **kwargs):
         # Acquire the lock before sub thread starting process so the client will have to wait before interacting
         # with the bot until it is connected, see on_ready function
@@ -1,6 +1,8 @@
 import json
 from pathlib import Path
 
+from Configuration.Enums import LogLevel
+
 
 class Configuration:
     """
@@ -8,24 +10,79 @@ class Configuration:
     subcomponent that needs access to some kind of configuration, setting or parameter
     """
 
-    def __init__(self):
+    def __init__(self, load_secrets=True):
         self.tcp_ip = '127.0.0.1'
         self.tcp_port = 1850
         self.tcp_buffer_size = 1024
 
+        # Settings of the local table server (Server/TableServer.py), which can be used instead of the real one.
+        # With a seed the games are deterministic, the latency in seconds is added before each reply.
+        self.table_server_seed = None
+        self.table_server_latency = 0
+        self.table_server_starting_chips = 1000
+        self.table_server_big_blind = 20
+
         self.message_sleep_time = 2
+
+        # Maximum number of messages processed concurrently by a bot, messages of a single author are always
+        # processed one after another
+        self.max_concurrent_messages = 4
         self.request_delay = 60
         self.encryption_enabled = True
 
+        # Join barrier: The table starts the game on its own as soon as this many players were added or, if at
+        # least join_min_players are seated, when join_deadline seconds passed since the first player joined
+        self.join_player_count = 3
+        self.join_min_players = 2
+        self.join_deadline = 60
+        self.game_started_message = 'Game started'
+
+        # Additional seconds the lead player waits after the join deadline before starting the game itself,
+        # so it does not compete with the table
+        self.join_fallback_margin = 15
+
+        # Minimum log level per category, categories not listed use the default level
+        self.log_default_level = LogLevel.INFO
+        self.log_levels = {
+            'bot': LogLevel.INFO,
+            'player': LogLevel.INFO,
+            'table': LogLevel.INFO,
+            'group2': LogLevel.INFO,
+        }
+
+        # Only 1 in N records of requests with the given method is logged, warnings and errors are never sampled
+        self.log_sample_rates = {
+            'status': 10,
+        }
+
+        # None = log to stdout
+        self.log_file = None
+
         self.keys = Path("../Configuration/keys/")
         self.secrets_file = Path("../Configuration/secrets.json")
 
+        # Directory of the hand history, each bot instance writes into its own subdirectory.
+        # Disabled by default because it requires numpy, which the bots do not need otherwise.
+        self.history_enabled = False
+        self.history_dir = Path("../History/data/")
+        self.history_segment_rows = 1 << 16
+
+        # Session state of the table side interfaces is written to this directory every snapshot_interval seconds
+        # and restored on startup
+        self.snapshot_dir = Path("../Configuration/snapshots/")
+        self.snapshot_interval = 5
+
+        # Components that don't connect to discord or reddit, e.g. the local table server, can run without secrets
         self.secrets = Secrets()
-        self.secrets.import_from_file(self.secrets_file)
+        if load_secrets:
+            self.secrets.import_from_file(self.secrets_file)
 
         self.table_instance_name = 'Table'
         self.reddit_user_agent = 'S4AE.Bot'
 
+        # Interval in seconds in which the submission used for communication is refreshed in the background
+        self.submission_refresh_interval = 30
+
         # Subreddit of group 1 (for testing)
         # self.subreddit_name = 'S4AE'
 
@@ -70,6 +127,14 @@ class Secrets:
         self.p2_app_id = secrets['p2_app_id']
         self.p2_app_secret = secrets['p2_app_secret']
 
+    @staticmethod
+    def get_credential_ids():
+        """
+        Returns the client side ids for which reddit credentials are configured
+        """
+
+        return ['Player1', 'Player2']
+
     def get_credentials(self, client_side_id):
         if client_side_id == 'Table':
             return None
@@ -9,4 +9,16 @@ class BotMode(Enum):
 # Selection how the client interacts with server in the sense of the messages transmitted, not how they are transmitted.
 class ClientMode(Enum):
     DISCORD = 0
-    REDDIT = 0
\ No newline at end of file
+    REDDIT = 0
+
+
+class HistorySource(Enum):
+    TABLE = 0
+    PLAYER = 1
+
+
+class LogLevel(Enum):
+    DEBUG = 10
+    INFO = 20
+    WARNING = 30
+    ERROR = 40
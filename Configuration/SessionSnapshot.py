@@ -0,0 +1,58 @@
+import atexit
+import json
+import threading
+from time import sleep
+
+
+class SessionSnapshot:
+    """
+    Periodically writes the session state of an interface to a json file, so it can be restored after a restart
+    of the bot instead of starting from scratch. The state is also written when the process exits and whenever
+    a message cursor moves, see Interface.message_handled.
+    """
+
+    def __init__(self, config, interface, instance_name):
+        self.config = config
+        self.interface = interface
+        self.path = self.config.snapshot_dir / (instance_name + '.json')
+        self.writer = None
+
+        # Saved from the periodic writer, the message processing threads and at exit
+        self.save_lock = threading.Lock()
+
+    def restore(self):
+        """
+        Loads the last snapshot, if one exists, and passes it to the interface
+
+        :return: True if a snapshot was restored
+        """
+
+        if not self.path.exists():
+            return False
+
+        with open(self.path, 'r') as f:
+            state = json.load(f)
+
+        self.interface.restore_session_state(state)
+        return True
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.json.tmp')
+
+        with self.save_lock:
+            # Write to a temporary file first so a crash while writing does not corrupt the last snapshot
+            with open(tmp_path, 'w') as f:
+                json.dump(self.interface.get_session_state(), f)
+            tmp_path.replace(self.path)
+
+    def start(self):
+        self.writer = threading.Thread(target=self.write_periodically, daemon=True)
+        self.writer.start()
+
+        atexit.register(self.save)
+
+    def write_periodically(self):
+        while True:
+            sleep(self.config.snapshot_interval)
+            self.save()
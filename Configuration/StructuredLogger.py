@@ -0,0 +1,126 @@
+import atexit
+import itertools
+import json
+import queue
+import sys
+import threading
+import time
+
+from Configuration.Enums import LogLevel
+
+
+class StructuredLogger:
+    """
+    Logger for the message hot paths. Records are only put into a queue by the calling thread, formatting them as
+    json lines and writing them is done by a background thread, so logging does not block the discord event loop.
+
+    Field values may be passed as callables, which are only evaluated by the writer thread. Records below the level
+    configured for their category are dropped before anything is formatted. The sample key may also be a callable,
+    it is only evaluated if the record passed the level check.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.queue = queue.SimpleQueue()
+        self.sample_counters = {}
+        self.writer = threading.Thread(target=self.write_records, daemon=True)
+        self.writer.start()
+
+        atexit.register(self.close)
+
+    def is_enabled(self, category, level: LogLevel):
+        min_level = self.config.log_levels.get(category, self.config.log_default_level)
+        return level.value >= min_level.value
+
+    def is_sampled(self, category, sample_key):
+        rate = self.config.log_sample_rates.get(sample_key, 1)
+
+        if rate <= 1:
+            return True
+
+        # next() on itertools.count is atomic, so no lock is needed for the counters
+        counter = self.sample_counters.get((category, sample_key))
+        if counter is None:
+            counter = self.sample_counters.setdefault((category, sample_key), itertools.count())
+
+        return next(counter) % rate == 0
+
+    def log(self, level: LogLevel, category, event, sample_key=None, **fields):
+        if not self.is_enabled(category, level):
+            return
+
+        if level.value < LogLevel.WARNING.value:
+            if callable(sample_key):
+                sample_key = sample_key()
+            if sample_key is not None and not self.is_sampled(category, sample_key):
+                return
+
+        self.queue.put((time.time(), level, category, event, fields))
+
+    def debug(self, category, event, sample_key=None, **fields):
+        self.log(LogLevel.DEBUG, category, event, sample_key, **fields)
+
+    def info(self, category, event, sample_key=None, **fields):
+        self.log(LogLevel.INFO, category, event, sample_key, **fields)
+
+    def warning(self, category, event, sample_key=None, **fields):
+        self.log(LogLevel.WARNING, category, event, sample_key, **fields)
+
+    def error(self, category, event, sample_key=None, **fields):
+        self.log(LogLevel.ERROR, category, event, sample_key, **fields)
+
+    def write_records(self):
+        if self.config.log_file is not None:
+            out = open(self.config.log_file, 'a')
+        else:
+            out = sys.stdout
+
+        while True:
+            record = self.queue.get()
+
+            if record is None:
+                break
+
+            # An error must not stop the writer thread, otherwise all following records would only pile up in the queue
+            try:
+                out.write(self.format_record(record))
+
+                # Only flush once the queue was drained to reduce the number of write calls
+                if self.queue.empty():
+                    out.flush()
+            except Exception as e:
+                self.report_failure(record, e)
+
+        try:
+            out.flush()
+        except Exception as e:
+            self.report_failure(None, e)
+
+    @staticmethod
+    def report_failure(record, error):
+        # The output itself may be broken, e.g. a closed pipe, so the failure can only be reported on stderr
+        try:
+            event = record[3] if record is not None else None
+            print('Writing log record {} failed: {!r}'.format(event, error), file=sys.stderr)
+        except Exception:
+            pass
+
+    @staticmethod
+    def format_record(record):
+        timestamp, level, category, event, fields = record
+
+        d = {'ts': round(timestamp, 3), 'level': level.name, 'cat': category, 'event': event}
+
+        for key, value in fields.items():
+            if callable(value):
+                value = value()
+            if isinstance(value, str):
+                value = value.strip()
+            d[key] = value
+
+        return json.dumps(d, separators=(',', ':'), default=str) + '\n'
+
+    def close(self):
+        if self.writer.is_alive():
+            self.queue.put(None)
+            self.writer.join()
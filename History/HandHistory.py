@@ -0,0 +1,299 @@
+import atexit
+import json
+import queue
+import threading
+import time
+
+import numpy as np
+
+from Configuration.Configuration import Configuration
+from Configuration.Enums import HistorySource
+from Configuration.StructuredLogger import StructuredLogger
+
+# Fixed width columns of the store, strings are dictionary encoded
+COLUMNS = {
+    'timestamp': np.float64,
+    'table': np.uint16,
+    'player': np.uint16,
+    'method': np.uint16,
+    'action': np.uint16,
+    'source': np.uint8,
+    'success': np.uint8,
+    'latency': np.float32,
+}
+
+ENCODED_COLUMNS = ['table', 'player', 'method', 'action']
+
+
+class Segment:
+    """
+    Fixed size part of the store. Each column is stored in its own memory mapped file.
+    """
+
+    def __init__(self, path, capacity):
+        self.path = path
+        self.capacity = capacity
+
+        create = not path.exists()
+        path.mkdir(parents=True, exist_ok=True)
+
+        self.columns = {
+            name: np.memmap(path / (name + '.bin'), dtype=dtype, mode='w+' if create else 'r+', shape=(capacity,))
+            for name, dtype in COLUMNS.items()
+        }
+
+    def flush(self):
+        for column in self.columns.values():
+            column.flush()
+
+
+class HandHistoryStore:
+    """
+    Append only, columnar store of all requests send to the table and the replies received.
+
+    Recording only puts the raw messages into a queue. Parsing, encoding and writing them into the segment files is
+    done by a background thread, so the bot is not slowed down. The query functions scan whole columns with numpy.
+    """
+
+    def __init__(self, config: Configuration, instance_name, logger: StructuredLogger):
+        self.config = config
+        self.logger = logger
+        self.path = self.config.history_dir / instance_name
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        self.queue = queue.SimpleQueue()
+        self.segments = []
+        self.rows = 0
+
+        # Dictionary encoding for the string columns, code 0 is the empty string
+        self.dictionary = {column: [''] for column in ENCODED_COLUMNS}
+        self.codes = {}
+
+        self.load()
+
+        self.writer = threading.Thread(target=self.write_records, daemon=True)
+        self.writer.start()
+
+        atexit.register(self.close)
+
+    def load(self):
+        meta_file = self.path / 'meta.json'
+
+        if meta_file.exists():
+            with open(meta_file, 'r') as f:
+                meta = json.load(f)
+            self.rows = meta['rows']
+            self.dictionary = meta['dictionary']
+
+        self.codes = {column: {value: code for code, value in enumerate(values)}
+                      for column, values in self.dictionary.items()}
+
+        segment_count = -(-self.rows // self.config.history_segment_rows)
+        for i in range(segment_count):
+            self.add_segment(i)
+
+    def save_meta(self):
+        meta_file = self.path / 'meta.json'
+        tmp_file = self.path / 'meta.json.tmp'
+
+        with open(tmp_file, 'w') as f:
+            json.dump({'rows': self.rows, 'dictionary': self.dictionary}, f)
+        tmp_file.replace(meta_file)
+
+    def add_segment(self, index):
+        segment = Segment(self.path / 'segment_{:06d}'.format(index), self.config.history_segment_rows)
+        self.segments.append(segment)
+        return segment
+
+    def record(self, table, source: HistorySource, request, reply, latency):
+        """
+        Records a request and the reply to it
+
+        :param table: Name of the table the request was send to
+        :param source: Whether the request was recorded by the table or a player
+        :param request: The request in the json-like format used for communication with the table
+        :param reply: The reply of the table as string
+        :param latency: Seconds between sending the request and receiving the reply
+        """
+
+        self.queue.put((time.time(), table, source, request, reply, latency))
+
+    def write_records(self):
+        while True:
+            record = self.queue.get()
+
+            if record is None:
+                break
+
+            # Write all records that are already queued at once
+            batch = [record]
+            stop = False
+            while not self.queue.empty() and len(batch) < self.config.history_segment_rows:
+                record = self.queue.get()
+                if record is None:
+                    stop = True
+                    break
+                batch.append(record)
+
+            # An error must not stop the writer thread, otherwise all following records would only pile up in the queue
+            try:
+                self.append([self.parse(record) for record in batch])
+            except Exception as e:
+                self.logger.error('history', 'write_failed', rows=len(batch), error=repr(e))
+
+            if stop:
+                break
+
+    def encode(self, column, value):
+        code = self.codes[column].get(value)
+
+        if code is None:
+            code = len(self.dictionary[column])
+
+            # Values are free text send by the players, so the dictionary may outgrow the column type.
+            # Further values are then stored as the empty string.
+            if code > np.iinfo(COLUMNS[column]).max:
+                self.logger.warning('history', 'dictionary_full', column=column, value=value)
+                return 0
+
+            self.dictionary[column].append(value)
+            self.codes[column][value] = code
+
+        return code
+
+    def parse(self, record):
+        timestamp, table, source, request, reply, latency = record
+
+        try:
+            msg_dict = json.loads(request.strip().replace('\'', '"'))
+        except ValueError:
+            msg_dict = {}
+
+        try:
+            success = json.loads(reply)['status'] == 'Success'
+        except (ValueError, KeyError, TypeError):
+            success = False
+
+        return (timestamp,
+                self.encode('table', table),
+                self.encode('player', msg_dict.get('name', '')),
+                self.encode('method', msg_dict.get('method', '')),
+                self.encode('action', msg_dict.get('action', '')),
+                source.value,
+                success,
+                latency)
+
+    def append(self, rows):
+        columns = {name: np.array(values, dtype=COLUMNS[name]) for name, values in zip(COLUMNS, zip(*rows))}
+        capacity = self.config.history_segment_rows
+
+        written = 0
+        while written < len(rows):
+            index, offset = divmod(self.rows, capacity)
+            segment = self.segments[index] if index < len(self.segments) else self.add_segment(index)
+            count = min(capacity - offset, len(rows) - written)
+
+            for name, values in columns.items():
+                segment.columns[name][offset:offset + count] = values[written:written + count]
+            segment.flush()
+
+            written += count
+            self.rows += count
+
+        self.save_meta()
+
+    def column(self, name, rows):
+        """
+        Returns the values of a column for the first rows of the store
+        """
+
+        capacity = self.config.history_segment_rows
+        parts = []
+
+        for index, segment in enumerate(self.segments):
+            count = min(capacity, rows - index * capacity)
+            if count <= 0:
+                break
+            parts.append(segment.columns[name][:count])
+
+        if not parts:
+            return np.empty(0, dtype=COLUMNS[name])
+        return np.concatenate(parts)
+
+    def mask(self, rows, source: HistorySource = None, **filters):
+        """
+        Returns a boolean mask of the rows matching the passed source and string column values
+        """
+
+        mask = np.ones(rows, dtype=bool)
+
+        if source is not None:
+            mask &= self.column('source', rows) == source.value
+
+        for name, value in filters.items():
+            code = self.codes[name].get(value)
+            if code is None:
+                return np.zeros(rows, dtype=bool)
+            mask &= self.column(name, rows) == code
+
+        return mask
+
+    def action_frequencies(self, source: HistorySource = HistorySource.TABLE):
+        """
+        Returns how often each player performed each action, e.g. {'Player1': {'call': 10, 'fold': 2}}
+        """
+
+        # Rows appended while the query runs are ignored
+        rows = self.rows
+        mask = self.mask(rows, source, method='call')
+        players = self.column('player', rows)[mask].astype(np.int64)
+        actions = self.column('action', rows)[mask].astype(np.int64)
+
+        combined, counts = np.unique(players << 16 | actions, return_counts=True)
+
+        frequencies = {}
+        for value, count in zip(combined.tolist(), counts.tolist()):
+            player = self.dictionary['player'][value >> 16]
+            action = self.dictionary['action'][value & 0xFFFF]
+            frequencies.setdefault(player, {})[action] = count
+        return frequencies
+
+    def latency_percentiles(self, source: HistorySource = HistorySource.TABLE, percentiles=(50, 90, 99)):
+        """
+        Returns the latency percentiles in seconds per request method, e.g. {'status': {50: 0.01, 90: 0.02, ...}}
+        """
+
+        rows = self.rows
+        mask = self.mask(rows, source)
+        methods = self.column('method', rows)[mask]
+        latencies = self.column('latency', rows)[mask]
+
+        result = {}
+        for code in np.unique(methods).tolist():
+            values = np.percentile(latencies[methods == code], percentiles)
+            result[self.dictionary['method'][code]] = dict(zip(percentiles, values.tolist()))
+        return result
+
+    def hands_per_hour(self, source: HistorySource = HistorySource.TABLE):
+        """
+        Returns the number of hands started per hour and table, e.g. {'Table': {1700000000: 42}}, keys of the inner
+        dict are the timestamps of the start of the hour
+        """
+
+        rows = self.rows
+        mask = self.mask(rows, source, method='start') & (self.column('success', rows) == 1)
+        tables = self.column('table', rows)[mask].astype(np.int64)
+        hours = (self.column('timestamp', rows)[mask] // 3600).astype(np.int64)
+
+        combined, counts = np.unique(hours << 16 | tables, return_counts=True)
+
+        result = {}
+        for value, count in zip(combined.tolist(), counts.tolist()):
+            table = self.dictionary['table'][value & 0xFFFF]
+            result.setdefault(table, {})[(value >> 16) * 3600] = count
+        return result
+
+    def close(self):
+        if self.writer.is_alive():
+            self.queue.put(None)
+            self.writer.join()
@@ -1,6 +1,8 @@
 import asyncio
 import json
+import queue
 import threading
+from time import sleep
 
 import praw
 from praw.models import Submission
@@ -8,6 +10,8 @@ from praw.models import Submission
 from Bot.Bot import Bot
 from Configuration.Configuration import Configuration
 from Configuration.Enums import BotMode
+from Configuration.SessionSnapshot import SessionSnapshot
+from Configuration.StructuredLogger import StructuredLogger
 from Interface import Interface
 
 
@@ -16,10 +20,18 @@ class Group2Interface(Interface):
     def __init__(self, config: Configuration):
         super().__init__(config)
 
-        self.reddits = {}
-        self.threads = {}
+        # One session per configured reddit account, created at startup so no reddit request is needed
+        # when a player sends its first message
+        self.sessions = {}
+        self.players = []
 
         self.private_message_receiver = []
+        self.submission_refresher = None
+
+        # Submission ids and inbox cursors restored from the last snapshot
+        self.restored_submissions = {}
+        self.restored_cursors = {}
+        self.snapshot = SessionSnapshot(config, self, 'Group2Interface')
 
     def start_bot(self):
         self.ready_lock.acquire()
@@ -31,8 +43,70 @@ class Group2Interface(Interface):
         self.bot.run(self.config.secrets.table_bot_token)
 
     def start(self):
+        self.snapshot.restore()
+        self.create_sessions()
+
         threading.Thread(target=self.start_bot).start()
 
+        for session in self.sessions.values():
+            session.warmed_up.wait()
+
+        # Wait until the bot is connected, the receivers need it to forward messages.
+        # An event is used because the ready lock is acquired by the bot thread, which may not have happened yet.
+        self.ready_event.wait()
+        self.start_receivers()
+
+        self.submission_refresher = SubmissionRefresher(self.config, list(self.sessions.values()), self.logger)
+        self.submission_refresher.start()
+
+        self.snapshot.start()
+
+    def get_session_state(self):
+        state = super().get_session_state()
+
+        state['players'] = list(self.players)
+
+        # Sessions that are not warmed up and receivers that are not running yet keep their restored values,
+        # otherwise a save during startup would lose them
+        state['submissions'] = dict(self.restored_submissions)
+        state['submissions'].update({player_id: session.submission.id for player_id, session in self.sessions.items()
+                                     if session.submission is not None})
+        state['inbox_cursors'] = dict(self.restored_cursors)
+        state['inbox_cursors'].update({pmr.player_id: pmr.cursor for pmr in list(self.private_message_receiver)
+                                       if pmr.cursor is not None})
+
+        return state
+
+    def restore_session_state(self, state):
+        super().restore_session_state(state)
+
+        self.players = state['players']
+        self.restored_submissions = state['submissions']
+        self.restored_cursors = state['inbox_cursors']
+
+    def create_sessions(self):
+        for player_id in self.config.secrets.get_credential_ids():
+            credentials = self.config.secrets.get_credentials(player_id)
+
+            if credentials is None:
+                continue
+
+            session = RedditSession(self.config, player_id, credentials, self.logger,
+                                    self.restored_submissions.get(player_id))
+            session.start()
+            self.sessions[player_id] = session
+
+    def start_receivers(self):
+        for player_id, session in self.sessions.items():
+            if session.reddit is None:
+                continue
+
+            # Start separate thread that awaits private messages of the reddit user and forwards these via discord
+            pmr = PrivateMessageReceiver(session.reddit, self.bot, player_id, self.logger,
+                                         self.restored_cursors.get(player_id), self.snapshot.save)
+            pmr.start()
+            self.private_message_receiver.append(pmr)
+
     def handle_message(self, msg, author):
         """
         Called by the bot instance whenever a message for this user is received
@@ -41,54 +115,33 @@ class Group2Interface(Interface):
         :param author: The discord username of the user that send the message
         """
 
-        print('Group2Interface received from discord:', msg.strip())
+        self.logger.info('group2', 'received_from_discord', sample_key=lambda: self.bot.sample_key(msg), author=author,
+                         content=msg)
 
         # If it's a "new" user, we must initialise some things
-        if author not in self.reddits:
+        if author not in self.players:
             self.add_player(author)
 
         converted_msg, send_privately = self.convert_message(msg)
 
-        # Get the reddit thread object for the author msg was send by
-        # We can use a single object for all because the posting reddit user is associated with it
-        author_thread_obj: Submission = self.threads.get(author)
-
-        # Based on the type of message send via private message or post as comment of the post
         if send_privately is None:
             # Message that cannot be processed by the reddit server interface will be ignored.
             return
-        if send_privately:
-            thread_creator = author_thread_obj.author
-            thread_creator.message("PokerSturm", converted_msg)
-        else:
-            author_thread_obj.reply(converted_msg)
+
+        # The actual reddit request is executed by the worker of the author's session, so the discord event loop
+        # never waits for reddit. Messages of a single author are still send in order.
+        self.sessions[author].submit(converted_msg, send_privately)
 
     def add_player(self, player_id):
 
         # Check if player with this id already known, should not occur.
-        if player_id in self.reddits or player_id in self.threads:
-            raise ValueError('Player {} already present in dicts!'.format(player_id))
+        if player_id in self.players:
+            raise ValueError('Player {} already present!'.format(player_id))
 
-        credentials = self.config.secrets.get_credentials(player_id)
-
-        if credentials is not None:
-            username, password, client_id, client_secret = credentials
-        else:
+        if player_id not in self.sessions:
             raise ValueError('No reddit credentials available for player {}'.format(player_id))
 
-        reddit = praw.Reddit(client_id=client_id, client_secret=client_secret, username=username, password=password,
-                             user_agent=self.config.reddit_user_agent, check_for_async=False)
-
-        # Get the most recent submission in the configured subreddit which is used for communication
-        thread = list(reddit.subreddit(self.config.subreddit_name).new(limit=1))[0]
-
-        # Start separate thread that awaits private messages of the reddit user and forwards these via discord
-        pmr = PrivateMessageReceiver(reddit, self.bot, player_id)
-        pmr.start()
-        self.private_message_receiver.append(pmr)
-
-        self.reddits[player_id] = reddit
-        self.threads[player_id] = thread
+        self.players.append(player_id)
 
     @staticmethod
     def convert_message(msg: str):
@@ -135,33 +188,149 @@ class Group2Interface(Interface):
         group2_interface.start()
 
 
+class RedditSession(threading.Thread):
+    """
+    Reddit session of a single account. All requests of this account are executed by this thread in the order
+    they were submitted, so the caller never blocks on reddit.
+    """
+
+    def __init__(self, config: Configuration, player_id, credentials, logger: StructuredLogger, submission_id=None):
+        super().__init__(daemon=True)
+        self.config = config
+        self.player_id = player_id
+        self.credentials = credentials
+        self.logger = logger
+        self.submission_id = submission_id
+
+        self.reddit: praw.Reddit = None
+        self.submission: Submission = None
+        self.warmed_up = threading.Event()
+        self.queue = queue.Queue()
+
+    def run(self):
+        try:
+            self.warm_up()
+        except Exception as e:
+            self.logger.error('group2', 'warm_up_failed', player=self.player_id, error=repr(e))
+        finally:
+            self.warmed_up.set()
+
+        while True:
+            job = self.queue.get()
+
+            if job is None:
+                break
+
+            try:
+                self.write(*job)
+            except Exception as e:
+                self.logger.error('group2', 'reddit_write_failed', player=self.player_id, error=repr(e))
+
+    def warm_up(self):
+        username, password, client_id, client_secret = self.credentials
+
+        self.reddit = praw.Reddit(client_id=client_id, client_secret=client_secret, username=username,
+                                  password=password, user_agent=self.config.reddit_user_agent, check_for_async=False)
+
+        if self.submission_id is not None:
+            # Restored after a restart, submission objects are lazy so this does not send a request to reddit.
+            # The submission refresher will replace it with the most recent one later.
+            self.submission = self.reddit.submission(id=self.submission_id)
+        else:
+            self.refresh_submission()
+
+    def refresh_submission(self):
+        # Get the most recent submission in the configured subreddit which is used for communication
+        self.submission = list(self.reddit.subreddit(self.config.subreddit_name).new(limit=1))[0]
+
+    def submit(self, converted_msg, send_privately):
+        self.queue.put((converted_msg, send_privately))
+
+    def write(self, converted_msg, send_privately):
+        # The submission object is bound to the reddit instance of this session, so the message is posted
+        # by the reddit user associated with the player
+        submission = self.submission
+
+        if send_privately:
+            thread_creator = submission.author
+            thread_creator.message("PokerSturm", converted_msg)
+        else:
+            submission.reply(converted_msg)
+
+    def stop(self):
+        self.queue.put(None)
+
+
+class SubmissionRefresher(threading.Thread):
+    """
+    Periodically replaces the submission of each session with the most recent one of the subreddit,
+    so this is not done before sending a message
+    """
+
+    def __init__(self, config: Configuration, sessions, logger: StructuredLogger):
+        super().__init__(daemon=True)
+        self.config = config
+        self.sessions = sessions
+        self.logger = logger
+
+    def run(self):
+        while True:
+            sleep(self.config.submission_refresh_interval)
+
+            for session in self.sessions:
+                if session.reddit is None:
+                    continue
+
+                try:
+                    session.refresh_submission()
+                except Exception as e:
+                    self.logger.error('group2', 'submission_refresh_failed', player=session.player_id, error=repr(e))
+
+
 class PrivateMessageReceiver(threading.Thread):
 
-    def __init__(self, reddit, bot, player_id):
+    def __init__(self, reddit, bot, player_id, logger: StructuredLogger, cursor=None, on_cursor_moved=None):
         super().__init__()
         self.reddit: praw.Reddit = reddit
         self.bot: Bot = bot
         self.player_id = player_id
+        self.logger = logger
+
+        # Creation time and id of the last message processed, [created_utc, fullname].
+        # Persisted through on_cursor_moved right after a message was forwarded, so only a crash between forwarding
+        # and saving can lead to the message being forwarded again.
+        self.cursor = cursor
+        self.on_cursor_moved = on_cursor_moved
 
     def run(self):
         print('Private Message Receiver: Waiting for messages for {} ...'.format(self.player_id))
 
-        for msg in self.reddit.inbox.stream(skip_existing=True):
+        # Without a cursor only new messages are processed, otherwise also the ones received since the cursor
+        for msg in self.reddit.inbox.stream(skip_existing=self.cursor is None):
+            if self.cursor is not None and [msg.created_utc, msg.fullname] <= self.cursor:
+                continue
+
             msg.mark_read()
 
             # print(self.player_id, 'received from reddit:', msg.body)
 
-            if msg.subject != 'PokerSturm-Server':
-                continue
-            else:
-                discord_msg = self.convert_message(msg.body)
+            if msg.subject == 'PokerSturm-Server':
+                try:
+                    discord_msg = self.convert_message(msg.body)
+                except ValueError as e:
+                    # The cursor is still moved, otherwise the message would be processed again after every restart
+                    self.logger.error('group2', 'unknown_message', player=self.player_id, content=msg.body,
+                                      error=repr(e))
+                    discord_msg = None
 
-                if discord_msg is None:
-                    continue
+                if discord_msg is not None:
+                    self.logger.info('group2', 'send_to_client', player=self.player_id, content=discord_msg)
 
-                print('Group2Interface send to client {}: {}'.format(self.player_id, discord_msg.strip()))
+                    self.bot.send_message(discord_msg, self.player_id)
 
-                self.bot.send_message(discord_msg, self.player_id)
+            self.cursor = [msg.created_utc, msg.fullname]
+            if self.on_cursor_moved is not None:
+                self.on_cursor_moved()
 
         print('PrivateMessageReceiver for {} stopped.'.format(self.player_id))
 
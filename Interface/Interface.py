@@ -2,6 +2,7 @@ import threading
 
 from Bot.Bot import Bot
 from Configuration.Configuration import Configuration
+from Configuration.StructuredLogger import StructuredLogger
 
 
 class Interface:
@@ -9,10 +10,73 @@ class Interface:
     def __init__(self, config: Configuration):
         self.config: Configuration = config
         self.ready_lock = threading.Lock()
+        self.ready_event = threading.Event()
+        self.logger = StructuredLogger(config)
         self.bot: Bot
 
+        # Discord message cursor, used to catch up on missed messages after a restart without replaying any:
+        # All received messages up to last_message_id were handled. Messages with a higher id are either still
+        # being processed (pending) or were handled already, while an older message was still pending.
+        self.message_lock = threading.Lock()
+        self.last_message_id = None
+        self.pending_message_ids = set()
+        self.handled_message_ids = set()
+
+        # Set by interfaces whose state is persisted, saved whenever the cursor moves
+        self.snapshot = None
+
     def handle_message(self, msg, author):
         return 'Interface handled message from {}: {} '.format(author, msg)
 
     def start(self):
         pass
+
+    def message_received(self, message_id):
+        """
+        Registers a discord message for processing
+
+        :return: False if the message was already received before and must be ignored
+        """
+
+        with self.message_lock:
+            if self.last_message_id is not None and message_id <= self.last_message_id:
+                return False
+            if message_id in self.pending_message_ids or message_id in self.handled_message_ids:
+                return False
+
+            self.pending_message_ids.add(message_id)
+            return True
+
+    def message_handled(self, message_id):
+        """
+        Called once a message was handled completely, including sending the reply
+        """
+
+        with self.message_lock:
+            self.pending_message_ids.discard(message_id)
+            self.handled_message_ids.add(message_id)
+
+            # The cursor can be moved up to the oldest message that is still being processed
+            oldest_pending = min(self.pending_message_ids, default=None)
+            done = {i for i in self.handled_message_ids if oldest_pending is None or i < oldest_pending}
+
+            if done:
+                if self.last_message_id is None or max(done) > self.last_message_id:
+                    self.last_message_id = max(done)
+                self.handled_message_ids -= done
+
+        if self.snapshot is not None:
+            self.snapshot.save()
+
+    def get_session_state(self):
+        """
+        Returns the state that is needed to continue serving after a restart, must be json serializable
+        """
+
+        with self.message_lock:
+            return {'last_message_id': self.last_message_id, 'handled_message_ids': sorted(self.handled_message_ids)}
+
+    def restore_session_state(self, state):
+        with self.message_lock:
+            self.last_message_id = state.get('last_message_id')
+            self.handled_message_ids = set(state.get('handled_message_ids', []))
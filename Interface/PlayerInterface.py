@@ -2,11 +2,11 @@ import asyncio
 import json
 import threading
 from random import randint
-from time import sleep
+from time import sleep, perf_counter
 
 from Bot.Bot import Bot
 from Configuration.Configuration import Configuration
-from Configuration.Enums import BotMode
+from Configuration.Enums import BotMode, HistorySource
 from Interface import Interface
 
 
@@ -32,6 +32,20 @@ class PlayerInterface(Interface):
         self.is_lead_player = is_lead_player
         self.single_request_finished = threading.Lock()
 
+        # Set once the reply to the addPlayer request was received or the table announced the start of the game
+        self.player_added = threading.Event()
+        self.game_started = threading.Event()
+
+        # Last request send to the table, used to record it together with the reply in the hand history
+        self.last_request = None
+        self.last_request_time = None
+
+        # Imported here because the hand history requires numpy, which is not needed if it is disabled
+        self.history = None
+        if config.history_enabled:
+            from History.HandHistory import HandHistoryStore
+            self.history = HandHistoryStore(config, player_id, self.logger)
+
     def start_bot(self):
         self.ready_lock.acquire()
 
@@ -46,21 +60,33 @@ class PlayerInterface(Interface):
         END_STATES = ["Winner-State", "End-State"]
 
         json_data = json.loads(msg)
-        print(self.player_id + ' received: ' + str(json_data).strip())
+        sample_key = 'status' if self.last_request_send == Requests.STATE else None
+        self.logger.info('player', 'received', sample_key=sample_key, player=self.player_id, content=json_data)
+
+        # Notification send by the table once the join barrier was reached, may arrive before the addPlayer reply
+        if json_data["message"] == self.config.game_started_message:
+            self.game_started.set()
+            return None
+
+        if self.history is not None and self.last_request is not None:
+            self.history.record(author, HistorySource.PLAYER, self.last_request, msg,
+                                perf_counter() - self.last_request_time)
+
+        if self.last_request_send == Requests.PLAYER_ADDED:
+            self.player_added.set()
+            return None
 
         # For playing manually this if would have to be changed
         if self.last_request_send == Requests.STATE:
 
             if json_data["message"] in CALL_STATES:
                 self.last_request_send = Requests.CURRENT_PLAYER
-                self.bot.send_message("{ 'method' : 'current' , 'name' : '" + self.player_id + "' , 'action' : '' }\n",
-                                      self.config.table_instance_name)
+                self.send_request("{ 'method' : 'current' , 'name' : '" + self.player_id + "' , 'action' : '' }\n")
 
             elif json_data["message"] in END_STATES:
                 if self.is_lead_player:
-                    self.bot.send_message(
-                        "{ 'method' : 'start' , 'name' : '+" + self.player_id + "' , 'action' : '' }\n",
-                        self.config.table_instance_name)
+                    self.send_request(
+                        "{ 'method' : 'start' , 'name' : '+" + self.player_id + "' , 'action' : '' }\n")
                 self.move_not_finished = False
 
             elif json_data["message"] == "Start-State":
@@ -71,8 +97,7 @@ class PlayerInterface(Interface):
 
             if json_data["message"] == self.player_id:
                 self.last_request_send = Requests.ACTION_REQUESTED
-                self.bot.send_message("{ 'method' : 'actions' , 'name' : '" + self.player_id + "' , 'action' : '' }\n",
-                                      self.config.table_instance_name)
+                self.send_request("{ 'method' : 'actions' , 'name' : '" + self.player_id + "' , 'action' : '' }\n")
             else:
                 self.move_not_finished = False
                 self.last_request_send = None
@@ -86,22 +111,20 @@ class PlayerInterface(Interface):
                 # If multiple actions are available ones is chosen randomly
                 decision = randint(0, 100)
                 if decision <= 10:
-                    self.bot.send_message(
-                        "{ 'method' : 'call' , 'name' : '" + self.player_id + "' , 'action' : '" + actions[0] + "' }\n",
-                        self.config.table_instance_name)
+                    self.send_request(
+                        "{ 'method' : 'call' , 'name' : '" + self.player_id + "' , 'action' : '" + actions[0] + "' }\n")
                 else:
                     if len(actions) == 2 or decision < 55:
-                        self.bot.send_message(
+                        self.send_request(
                             "{ 'method' : 'call' , 'name' : '" + self.player_id + "' , 'action' : '" + actions[
-                                1] + "' }\n", self.config.table_instance_name)
+                                1] + "' }\n")
                     else:
-                        self.bot.send_message(
+                        self.send_request(
                             "{ 'method' : 'call' , 'name' : '" + self.player_id + "' , 'action' : '" + actions[
-                                2] + "' }\n", self.config.table_instance_name)
+                                2] + "' }\n")
             elif actions[0] == "none":
-                self.bot.send_message(
-                    "{ 'method' : 'call' , 'name' : '" + self.player_id + "' , 'action' : 'allin' }\n",
-                    self.config.table_instance_name)
+                self.send_request(
+                    "{ 'method' : 'call' , 'name' : '" + self.player_id + "' , 'action' : 'allin' }\n")
             else:
                 # In case the message received does not match the expected format, i. e. does not provide possible actions
                 self.move_not_finished = False
@@ -112,25 +135,32 @@ class PlayerInterface(Interface):
 
         return None
 
+    def send_request(self, msg):
+        self.last_request = msg
+
+        # Bot.send_message sleeps message_sleep_time before actually sending, which should not count as latency
+        self.last_request_time = perf_counter() + self.config.message_sleep_time
+        self.bot.send_message(msg, self.config.table_instance_name)
+
     def start(self):
         threading.Thread(target=self.start_bot).start()
 
         self.ready_lock.acquire()
 
-        self.bot.send_message("{ 'method' : 'addPlayer' , 'name' : '" + self.player_id + "' , 'action' : '' }\n",
-                              self.config.table_instance_name)
+        self.send_request("{ 'method' : 'addPlayer' , 'name' : '" + self.player_id + "' , 'action' : '' }\n")
         self.last_request_send = Requests.PLAYER_ADDED
 
-        if self.is_lead_player:
-            input("Input something when all players were added\n")
+        # The table starts the game on its own once enough players joined and notifies all seated players.
+        # Only if no notification arrives, e.g. because the table does not support this, the lead player starts it.
+        # The fallback must only fire after the table's own join deadline passed, otherwise both would start the game
+        start_timeout = self.config.join_deadline + self.config.join_fallback_margin
+        print("Waiting up to {} seconds for other players to join and the game to start".format(start_timeout))
+        self.player_added.wait(self.config.request_delay)
+        self.game_started.wait(start_timeout)
 
-            self.bot.send_message("{ 'method' : 'start' , 'name' : '" + self.player_id + "' , 'action' : '' }\n",
-                                  self.config.table_instance_name)
+        if not self.game_started.is_set() and self.is_lead_player:
             self.last_request_send = Requests.GAME_STARTED
-        else:
-            print("Waiting {} seconds for other players to join and lead player to start the game".format(
-                self.config.request_delay))
-            sleep(self.config.request_delay)
+            self.send_request("{ 'method' : 'start' , 'name' : '" + self.player_id + "' , 'action' : '' }\n")
 
         while True:
 
@@ -138,8 +168,7 @@ class PlayerInterface(Interface):
             # query and sending this via the bot
             self.last_request_send = Requests.STATE
             self.move_not_finished = True
-            self.bot.send_message("{ 'method' : 'status' , 'name' : '" + self.player_id + "' , 'action' : '' }\n",
-                                  self.config.table_instance_name)
+            self.send_request("{ 'method' : 'status' , 'name' : '" + self.player_id + "' , 'action' : '' }\n")
 
             # Cant use a lock for this purpose because the bot thread can only lock access when the 1st message
             # of the sequence is received, in which case the main thread
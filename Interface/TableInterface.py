@@ -1,10 +1,12 @@
 import asyncio
 import json
 import threading
+from time import perf_counter
 
 from Bot.Bot import Bot
 from Configuration.Configuration import Configuration
-from Configuration.Enums import BotMode
+from Configuration.Enums import BotMode, HistorySource
+from Configuration.SessionSnapshot import SessionSnapshot
 from Interface import Interface
 
 
@@ -17,6 +19,22 @@ class TableInterface(Interface):
     def __init__(self, config: Configuration):
         super().__init__(config)
 
+        # The table socket is shared between the bot thread and the join deadline timer
+        self.socket_lock = threading.Lock()
+
+        # State of the join barrier, guarded by join_lock
+        self.join_lock = threading.Lock()
+        self.seated_players = []
+        self.game_started = False
+        self.join_timer = None
+
+        # Imported here because the hand history requires numpy, which is not needed if it is disabled
+        self.history = None
+        if config.history_enabled:
+            from History.HandHistory import HandHistoryStore
+            self.history = HandHistoryStore(config, config.table_instance_name, self.logger)
+        self.snapshot = SessionSnapshot(config, self, 'TableInterface')
+
     def start_bot(self):
         self.ready_lock.acquire()
 
@@ -27,20 +45,177 @@ class TableInterface(Interface):
         self.bot.run(self.config.secrets.table_bot_token)
 
     def start(self):
+        restored = self.snapshot.restore()
+
         threading.Thread(target=self.start_bot).start()
 
+        self.snapshot.start()
+
+        if restored:
+            self.ready_event.wait()
+            self.verify_restored_state()
+
+    def get_session_state(self):
+        state = super().get_session_state()
+
+        with self.join_lock:
+            state['seated_players'] = list(self.seated_players)
+            state['game_started'] = self.game_started
+
+        return state
+
+    def restore_session_state(self, state):
+        super().restore_session_state(state)
+
+        # Only valid if the table still knows these players, which is checked once the socket is connected
+        with self.join_lock:
+            self.seated_players = state['seated_players']
+            self.game_started = state['game_started']
+
+    def verify_restored_state(self):
+        """
+        Checks the restored seated players against the table, because the table socket was reconnected. The local
+        table server e.g. creates a new, empty table for every connection.
+        """
+
+        with self.join_lock:
+            restored_players = list(self.seated_players)
+
+        confirmed = [player_id for player_id in restored_players if self.is_success(
+            self.forward_to_table("{ 'method' : 'info' , 'name' : '" + player_id + "' , 'action' : '' }\n"))]
+
+        with self.join_lock:
+            # Players added since the restart were acknowledged by the table already and are kept
+            self.seated_players = [p for p in self.seated_players if p not in restored_players or p in confirmed]
+
+            # None of the players is known, so this is a new table on which the game was not started yet
+            if restored_players and not confirmed:
+                self.game_started = False
+
+            # Players may have joined before the restart, so the join deadline applies again
+            if self.seated_players and not self.game_started and self.join_timer is None:
+                self.start_join_timer()
+
+        self.logger.info('table', 'restored_state_verified', restored=restored_players, confirmed=confirmed)
+
     def handle_message(self, msg, author):
 
         if not self.check_secure_request(msg, author):
+            self.logger.error('table', 'insecure_request', author=author, content=msg)
             return
 
-        self.bot.table_socket.send(msg.encode())
-        print('Table interface SEND TO table:', msg.strip())
-        server_reply = self.bot.table_socket.recv(self.config.tcp_buffer_size).decode('UTF-8')
-        print('Table interface RECEIVED FROM table:', server_reply.strip())
-        print()
+        server_reply = self.forward_to_table(msg)
+        self.update_join_barrier(msg, server_reply)
+
         return server_reply
 
+    def forward_to_table(self, msg):
+        with self.socket_lock:
+            request_time = perf_counter()
+            self.bot.table_socket.send(msg.encode())
+            server_reply = self.bot.table_socket.recv(self.config.tcp_buffer_size).decode('UTF-8')
+            latency = perf_counter() - request_time
+
+        if self.history is not None:
+            self.history.record(self.config.table_instance_name, HistorySource.TABLE, msg, server_reply, latency)
+
+        self.logger.info('table', 'forwarded', sample_key=lambda: self.bot.sample_key(msg), request=msg,
+                         reply=server_reply)
+        return server_reply
+
+    def update_join_barrier(self, msg, server_reply):
+        """
+        Keeps track of the players seated at the table based on the acknowledged addPlayer and removePlayer requests
+        and starts the game once the configured player count is reached
+
+        """
+
+        msg_dict = json.loads(msg.strip().replace('\'', '"'))
+        success = self.is_success(server_reply)
+        start_now = False
+        late_player = None
+
+        with self.join_lock:
+            if msg_dict['method'] == 'start' and success:
+                # Game was started by a player directly, so the barrier is no longer needed
+                self.game_started = True
+                self.cancel_join_timer()
+            elif msg_dict['method'] == 'addPlayer' and success and msg_dict['name'] not in self.seated_players:
+                self.seated_players.append(msg_dict['name'])
+
+                if self.game_started:
+                    # Joined after the game was started, so the player would otherwise wait for the fallback timeout
+                    late_player = msg_dict['name']
+                elif len(self.seated_players) >= self.config.join_player_count:
+                    self.game_started = True
+                    self.cancel_join_timer()
+                    start_now = True
+                elif self.join_timer is None:
+                    self.start_join_timer()
+            elif msg_dict['method'] == 'removePlayer' and success and msg_dict['name'] in self.seated_players:
+                self.seated_players.remove(msg_dict['name'])
+
+        if start_now:
+            self.start_game()
+        elif late_player is not None:
+            self.notify_game_started([late_player])
+
+    def on_join_deadline(self):
+        with self.join_lock:
+            self.join_timer = None
+
+            if self.game_started or len(self.seated_players) < self.config.join_min_players:
+                return
+
+            self.game_started = True
+
+        self.start_game()
+
+    def start_join_timer(self):
+        # Must be called while holding join_lock
+        self.join_timer = threading.Timer(self.config.join_deadline, self.on_join_deadline)
+        self.join_timer.daemon = True
+        self.join_timer.start()
+
+    def cancel_join_timer(self):
+        if self.join_timer is not None:
+            self.join_timer.cancel()
+            self.join_timer = None
+
+    def start_game(self):
+        """
+        Starts the game at the table and notifies all seated players, so they can start polling immediately
+        """
+
+        with self.join_lock:
+            players = list(self.seated_players)
+
+        server_reply = self.forward_to_table("{ 'method' : 'start' , 'name' : '" + players[0] + "' , 'action' : '' }\n")
+
+        if not self.is_success(server_reply):
+            # Players are only notified if the game was actually started. The barrier fires again on the next join
+            # or, if nobody else joins, when the restarted deadline passes.
+            self.logger.error('table', 'start_failed', players=players, reply=server_reply)
+            with self.join_lock:
+                self.game_started = False
+                if self.join_timer is None:
+                    self.start_join_timer()
+            return
+
+        self.notify_game_started(players)
+
+    def notify_game_started(self, players):
+        notification = '{"status" : "Success" , "message" : "' + self.config.game_started_message + '"}\n'
+        for player_id in players:
+            self.bot.send_message(notification, player_id)
+
+    @staticmethod
+    def is_success(server_reply):
+        try:
+            return json.loads(server_reply)['status'] == 'Success'
+        except (ValueError, KeyError, TypeError):
+            return False
+
     @staticmethod
     def check_secure_request(msg, author):
         """
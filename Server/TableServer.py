@@ -0,0 +1,414 @@
+import argparse
+import asyncio
+import itertools
+import json
+import random
+from itertools import combinations
+
+from Configuration.Configuration import Configuration
+
+RANKS = '23456789TJQKA'
+SUITS = 'cdhs'
+
+BETTING_STATES = ['Pre-Flop-State', 'Flop-State', 'Turn-State', 'River-State']
+
+# Number of bets / raises allowed per betting round, so a round always terminates
+MAX_RAISES = 4
+
+
+def hand_value(cards):
+    """
+    Returns a comparable value of the best five card hand that can be formed out of the passed cards
+
+    """
+
+    return max(five_card_value(hand) for hand in combinations(cards, 5))
+
+
+def five_card_value(hand):
+    values = sorted((RANKS.index(card[0]) for card in hand), reverse=True)
+    counts = {v: values.count(v) for v in values}
+
+    # Values ordered by how often they occur first and by their rank second
+    grouped = sorted(counts, key=lambda v: (counts[v], v), reverse=True)
+    shape = sorted(counts.values(), reverse=True)
+
+    flush = len({card[1] for card in hand}) == 1
+    straight = len(counts) == 5 and values[0] - values[4] == 4
+    if values == [12, 3, 2, 1, 0]:
+        # Wheel, the ace counts as one
+        straight, grouped = True, [3, 2, 1, 0, -1]
+
+    if straight and flush:
+        category = 8
+    elif shape == [4, 1]:
+        category = 7
+    elif shape == [3, 2]:
+        category = 6
+    elif flush:
+        category = 5
+    elif straight:
+        category = 4
+    elif shape == [3, 1, 1]:
+        category = 3
+    elif shape == [2, 2, 1]:
+        category = 2
+    elif shape == [2, 1, 1, 1]:
+        category = 1
+    else:
+        category = 0
+
+    return category, grouped
+
+
+class TableError(Exception):
+    pass
+
+
+class PokerTable:
+    """
+    Simplified no limit texas hold'em table with a fixed bet size of one big blind. Side pots are not modelled,
+    a player that went all in can win the whole pot.
+    """
+
+    def __init__(self, config: Configuration, rng: random.Random):
+        self.config = config
+        self.rng = rng
+
+        self.chips = {}
+        self.state = 'Start-State'
+        self.dealer = -1
+
+        self.hands = {}
+        self.community = []
+        self.deck = []
+        self.pot = 0
+        self.folded = set()
+        self.round_bets = {}
+        self.current_bet = 0
+        self.raises = 0
+        self.acted = set()
+        self.current = None
+        self.winners = []
+
+    def handle(self, method, name, action):
+        if method == 'addPlayer':
+            return self.add_player(name)
+        elif method == 'start':
+            return self.start_hand()
+        elif method == 'status':
+            return self.state
+        elif method == 'current':
+            return self.current if self.current is not None else 'none'
+        elif method == 'actions':
+            self.check_turn(name)
+            return ','.join(self.available_actions(name))
+        elif method == 'call':
+            self.check_turn(name)
+            self.perform(name, action)
+            return 'Action performed'
+        elif method == 'info':
+            return self.info(name)
+        elif method == 'removePlayer':
+            return self.remove_player(name)
+        elif method == 'update':
+            return 'Updated'
+        else:
+            raise TableError('Unknown method ' + method)
+
+    @property
+    def players(self):
+        return list(self.chips)
+
+    def in_hand(self):
+        return [p for p in self.players if p in self.hands and p not in self.folded]
+
+    def can_act(self, player):
+        return player in self.in_hand() and self.chips[player] > 0
+
+    def next_player(self, index, condition):
+        players = self.players
+        for offset in range(1, len(players) + 1):
+            player = players[(index + offset) % len(players)]
+            if condition(player):
+                return player
+        return None
+
+    def add_player(self, name):
+        if name in self.chips:
+            raise TableError('Player already added')
+        if len(self.chips) >= 10:
+            raise TableError('Table is full')
+
+        self.chips[name] = self.config.table_server_starting_chips
+        return 'Player added'
+
+    def remove_player(self, name):
+        if name not in self.chips:
+            raise TableError('Unknown player')
+
+        if self.state in BETTING_STATES and name in self.in_hand():
+            if self.current == name:
+                self.perform(name, 'fold')
+            else:
+                self.folded.add(name)
+                self.check_hand_finished()
+
+        del self.chips[name]
+        self.hands.pop(name, None)
+        if self.current == name:
+            self.current = None
+
+        # The hand may have been finished by the fold above while the player was still counted
+        if self.state == 'Winner-State':
+            self.update_finished_state()
+        return 'Player removed'
+
+    def info(self, name):
+        if name not in self.chips:
+            raise TableError('Unknown player')
+
+        return 'cards: {}, community: {}, chips: {}, pot: {}'.format(
+            ' '.join(self.hands.get(name, [])), ' '.join(self.community), self.chips[name], self.pot)
+
+    def check_turn(self, name):
+        if self.state not in BETTING_STATES or self.current != name:
+            raise TableError('Not your turn')
+
+    def start_hand(self):
+        if self.state in BETTING_STATES:
+            raise TableError('Game already running')
+
+        seated = [p for p in self.players if self.chips[p] > 0]
+        if len(seated) < 2:
+            raise TableError('Not enough players')
+
+        self.deck = [rank + suit for rank in RANKS for suit in SUITS]
+        self.rng.shuffle(self.deck)
+
+        self.hands = {p: [self.deck.pop(), self.deck.pop()] for p in seated}
+        self.community = []
+        self.pot = 0
+        self.folded = set()
+        self.winners = []
+
+        players = self.players
+        self.dealer = players.index(self.next_player(self.dealer, lambda p: p in self.hands))
+        small_blind = self.next_player(self.dealer, lambda p: p in self.hands)
+        big_blind = self.next_player(players.index(small_blind), lambda p: p in self.hands)
+
+        self.start_betting_round('Pre-Flop-State')
+        self.put(small_blind, self.config.table_server_big_blind // 2)
+        self.put(big_blind, self.config.table_server_big_blind)
+        self.current_bet = max(self.round_bets.values())
+
+        self.current = self.next_player(players.index(big_blind), self.can_act)
+        self.check_round_finished()
+        return 'Game started'
+
+    def start_betting_round(self, state):
+        self.state = state
+        self.round_bets = {p: 0 for p in self.in_hand()}
+        self.current_bet = 0
+        self.raises = 0
+        self.acted = set()
+
+    def put(self, player, amount):
+        amount = min(amount, self.chips[player])
+        self.chips[player] -= amount
+        self.round_bets[player] += amount
+        self.pot += amount
+
+    def available_actions(self, player):
+        to_call = self.current_bet - self.round_bets[player]
+
+        if self.chips[player] <= to_call:
+            # Only going all in is possible
+            return ['none']
+
+        if to_call == 0:
+            actions = ['fold', 'check', 'bet']
+        else:
+            actions = ['fold', 'call', 'raise']
+
+        if self.raises >= MAX_RAISES:
+            actions = actions[:2]
+
+        return actions
+
+    def perform(self, player, action):
+        to_call = self.current_bet - self.round_bets[player]
+        available = self.available_actions(player)
+
+        if action == 'fold':
+            self.folded.add(player)
+        elif action == 'allin':
+            self.put(player, self.chips[player])
+        elif action not in available:
+            raise TableError('Action not available')
+        elif action == 'call':
+            self.put(player, to_call)
+        elif action in ['bet', 'raise']:
+            self.put(player, to_call + self.config.table_server_big_blind)
+            self.raises += 1
+
+        if self.round_bets[player] > self.current_bet:
+            self.current_bet = self.round_bets[player]
+            self.acted = set()
+        self.acted.add(player)
+
+        if self.check_hand_finished():
+            return
+
+        self.current = self.next_player(self.players.index(player), self.can_act)
+        self.check_round_finished()
+
+    def check_hand_finished(self):
+        remaining = self.in_hand()
+
+        if len(remaining) == 1:
+            self.finish_hand(remaining)
+            return True
+        return False
+
+    def check_round_finished(self):
+        active = [p for p in self.in_hand() if self.chips[p] > 0]
+        settled = all(p in self.acted and self.round_bets[p] == self.current_bet for p in active)
+
+        # A single player left who can act only has to act if he did not match the current bet yet
+        if len(active) == 1 and self.round_bets[active[0]] >= self.current_bet:
+            settled = True
+
+        if not settled:
+            return
+
+        while True:
+            if self.state == 'River-State':
+                self.showdown()
+                return
+
+            next_state = BETTING_STATES[BETTING_STATES.index(self.state) + 1]
+            self.community += [self.deck.pop() for _ in range(3 if next_state == 'Flop-State' else 1)]
+            self.start_betting_round(next_state)
+
+            # If at most one player still has chips, the remaining cards are dealt without betting
+            if len([p for p in self.in_hand() if self.chips[p] > 0]) > 1:
+                self.current = self.next_player(self.dealer, self.can_act)
+                return
+
+    def showdown(self):
+        values = {p: hand_value(self.hands[p] + self.community) for p in self.in_hand()}
+        best = max(values.values())
+        self.finish_hand([p for p in values if values[p] == best])
+
+    def finish_hand(self, winners):
+        share, remainder = divmod(self.pot, len(winners))
+        for winner in winners:
+            self.chips[winner] += share
+        self.chips[winners[0]] += remainder
+
+        self.pot = 0
+        self.winners = winners
+        self.current = None
+        self.update_finished_state()
+
+    def update_finished_state(self):
+        if len([p for p in self.players if self.chips[p] > 0]) <= 1:
+            self.state = 'End-State'
+        else:
+            self.state = 'Winner-State'
+
+
+class TableServer:
+    """
+    Local stand-in for the table server that TableInterface connects to. It uses the same line based protocol and
+    reply format. Every connection gets its own table, so many tables can be simulated by a single instance.
+    """
+
+    def __init__(self, config: Configuration):
+        self.config = config
+        self.table_counter = itertools.count()
+
+    def create_table(self):
+        table_number = next(self.table_counter)
+
+        if self.config.table_server_seed is not None:
+            rng = random.Random(self.config.table_server_seed + table_number)
+        else:
+            rng = random.Random()
+
+        return PokerTable(self.config, rng)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        table = self.create_table()
+
+        try:
+            while True:
+                line = await reader.readline()
+
+                if not line:
+                    break
+
+                reply = self.handle_request(table, line.decode('UTF-8'))
+
+                if self.config.table_server_latency > 0:
+                    await asyncio.sleep(self.config.table_server_latency)
+
+                writer.write(reply.encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def handle_request(table: PokerTable, msg):
+        try:
+            msg_dict = json.loads(msg.strip().replace('\'', '"'))
+            message = table.handle(msg_dict['method'], msg_dict.get('name', ''), msg_dict.get('action', ''))
+            status = 'Success'
+        except TableError as e:
+            message, status = str(e), 'Failure'
+        except (ValueError, KeyError, AttributeError, TypeError):
+            message, status = 'Invalid request', 'Failure'
+
+        # Same spacing as the replies of the real table server, json.dumps escapes quotes in the message
+        return json.dumps({'status': status, 'message': message}, separators=(' , ', ' : ')) + '\n'
+
+    async def start_server(self):
+        return await asyncio.start_server(self.handle_connection, self.config.tcp_ip, self.config.tcp_port)
+
+    async def serve(self):
+        server = await self.start_server()
+        print('Table server listening on {}:{}'.format(self.config.tcp_ip, self.config.tcp_port))
+
+        async with server:
+            await server.serve_forever()
+
+    @staticmethod
+    def start_instance(tcp_ip=None, tcp_port=None, seed=None, latency=None):
+        # The table server does not need any secrets, so it can also run in CI or on load test machines
+        config = Configuration(load_secrets=False)
+
+        if tcp_ip is not None:
+            config.tcp_ip = tcp_ip
+        if tcp_port is not None:
+            config.tcp_port = tcp_port
+        if seed is not None:
+            config.table_server_seed = seed
+        if latency is not None:
+            config.table_server_latency = latency
+
+        table_server = TableServer(config)
+        asyncio.run(table_server.serve())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Local stand-in for the poker table server')
+    parser.add_argument('--host', help='Address to listen on, defaults to the configured tcp_ip')
+    parser.add_argument('--port', type=int, help='Port to listen on, defaults to the configured tcp_port')
+    parser.add_argument('--seed', type=int, help='Seed for deterministic games')
+    parser.add_argument('--latency', type=float, help='Artificial delay in seconds added before each reply')
+    args = parser.parse_args()
+
+    TableServer.start_instance(args.host, args.port, args.seed, args.latency)
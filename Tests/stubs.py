@@ -0,0 +1,43 @@
+import sys
+import types
+from pathlib import Path
+from unittest import mock
+
+
+def install_stubs():
+    """
+    Makes the interfaces importable without discord, praw and cryptography. The stubs are only installed if the real
+    packages are missing, the tests never use the parts that would need them.
+    """
+
+    try:
+        import discord
+    except ImportError:
+        discord = types.ModuleType('discord')
+        discord.Client = type('Client', (), {'__init__': lambda self, **options: None})
+        discord.Message = type('Message', (), {})
+        discord.Object = lambda id: types.SimpleNamespace(id=id)
+        discord.Webhook = mock.MagicMock()
+        discord.RequestsWebhookAdapter = mock.MagicMock()
+        sys.modules['discord'] = discord
+
+    try:
+        import cryptography
+    except ImportError:
+        for name in ['cryptography', 'cryptography.hazmat', 'cryptography.hazmat.backends',
+                     'cryptography.hazmat.primitives', 'cryptography.hazmat.primitives.asymmetric']:
+            sys.modules[name] = mock.MagicMock()
+        exceptions = types.ModuleType('cryptography.exceptions')
+        exceptions.InvalidSignature = type('InvalidSignature', (Exception,), {})
+        sys.modules['cryptography.exceptions'] = exceptions
+
+    try:
+        import praw
+    except ImportError:
+        sys.modules['praw'] = mock.MagicMock()
+        sys.modules['praw.models'] = mock.MagicMock()
+
+    # The interfaces import each other like scripts started from the Interface directory
+    interface_dir = str(Path(__file__).parent.parent / 'Interface')
+    if interface_dir not in sys.path:
+        sys.path.insert(0, interface_dir)
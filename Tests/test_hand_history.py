@@ -0,0 +1,99 @@
+import tempfile
+import unittest
+from pathlib import Path
+from time import sleep
+
+from Configuration.Configuration import Configuration
+from Configuration.Enums import HistorySource
+from Configuration.StructuredLogger import StructuredLogger
+
+try:
+    from History.HandHistory import HandHistoryStore
+except ImportError:
+    HandHistoryStore = None
+
+SUCCESS = '{"status" : "Success" , "message" : ""}\n'
+FAILURE = '{"status" : "Failure" , "message" : ""}\n'
+
+
+def request(method, name='Player1', action=''):
+    return "{ 'method' : '" + method + "' , 'name' : '" + name + "' , 'action' : '" + action + "' }\n"
+
+
+@unittest.skipIf(HandHistoryStore is None, 'numpy is not installed')
+class HandHistoryStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+        self.config = Configuration(load_secrets=False)
+        self.config.history_dir = Path(self.directory.name)
+        self.config.history_segment_rows = 4
+        self.logger = StructuredLogger(self.config)
+
+    def tearDown(self):
+        self.logger.close()
+        self.directory.cleanup()
+
+    def open_store(self):
+        return HandHistoryStore(self.config, 'Table', self.logger)
+
+    def test_records_span_segments_and_survive_reopening(self):
+        store = self.open_store()
+        for i in range(10):
+            store.record('Table', HistorySource.TABLE, request('status'), SUCCESS, 0.1)
+        store.close()
+
+        store = self.open_store()
+        self.assertEqual(store.rows, 10)
+        self.assertEqual(len(store.segments), 3)
+        store.close()
+
+    def test_action_frequencies(self):
+        store = self.open_store()
+        for name, action in [('Player1', 'call'), ('Player1', 'call'), ('Player1', 'fold'), ('Player2', 'raise')]:
+            store.record('Table', HistorySource.TABLE, request('call', name, action), SUCCESS, 0.1)
+
+        # Requests recorded by players are ignored by default
+        store.record('Table', HistorySource.PLAYER, request('call', 'Player2', 'fold'), SUCCESS, 0.1)
+        store.close()
+
+        self.assertEqual(store.action_frequencies(), {'Player1': {'call': 2, 'fold': 1}, 'Player2': {'raise': 1}})
+
+    def test_latency_percentiles(self):
+        store = self.open_store()
+        for latency in [1, 2, 3, 4, 5]:
+            store.record('Table', HistorySource.TABLE, request('status'), SUCCESS, latency)
+        store.record('Table', HistorySource.TABLE, request('info'), SUCCESS, 10)
+        store.close()
+
+        percentiles = store.latency_percentiles(percentiles=(0, 50, 100))
+        self.assertEqual(percentiles, {'status': {0: 1.0, 50: 3.0, 100: 5.0}, 'info': {0: 10.0, 50: 10.0, 100: 10.0}})
+
+    def test_hands_per_hour_counts_successful_starts(self):
+        store = self.open_store()
+        store.record('Table', HistorySource.TABLE, request('start'), SUCCESS, 0.1)
+        store.record('Table', HistorySource.TABLE, request('start'), SUCCESS, 0.1)
+        store.record('Table', HistorySource.TABLE, request('start'), FAILURE, 0.1)
+        store.close()
+
+        hands = store.hands_per_hour()
+        self.assertEqual(list(hands), ['Table'])
+        self.assertEqual(sum(hands['Table'].values()), 2)
+
+    def test_invalid_records_do_not_stop_writer(self):
+        store = self.open_store()
+        store.record('Table', HistorySource.TABLE, None, SUCCESS, 0.1)
+
+        # Once the queue is empty the invalid record was taken by the writer, so the next one is a separate batch
+        while not store.queue.empty():
+            sleep(0.01)
+
+        store.record('Table', HistorySource.TABLE, request('status'), SUCCESS, 0.1)
+        store.close()
+
+        self.assertEqual(store.rows, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
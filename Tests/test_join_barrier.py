@@ -0,0 +1,135 @@
+import asyncio
+import socket
+import threading
+import unittest
+from time import sleep, time
+
+from Configuration.Configuration import Configuration
+from Server.TableServer import TableServer
+from Tests.stubs import install_stubs
+
+install_stubs()
+
+from Bot.Bot import Bot
+from TableInterface import TableInterface
+
+
+def request(method, name, action=''):
+    return "{ 'method' : '" + method + "' , 'name' : '" + name + "' , 'action' : '" + action + "' }\n"
+
+
+class FakeBot:
+    """
+    Stands in for the discord bot of the table interface: Requests are forwarded to a real table server, messages
+    send to the players are only recorded.
+    """
+
+    sample_key = staticmethod(Bot.sample_key)
+
+    def __init__(self, port):
+        self.table_socket = socket.create_connection(('127.0.0.1', port))
+        self.sent = []
+
+    def send_message(self, message_content, recipient):
+        self.sent.append((message_content, recipient))
+
+
+class JoinBarrierTest(unittest.TestCase):
+
+    def setUp(self):
+        self.config = Configuration(load_secrets=False)
+        self.config.tcp_ip = '127.0.0.1'
+        self.config.tcp_port = 0
+        self.config.history_enabled = False
+        self.config.join_player_count = 3
+        self.config.join_min_players = 2
+        self.config.join_deadline = 0.2
+
+        self.loop = asyncio.new_event_loop()
+        self.server = self.loop.run_until_complete(TableServer(self.config).start_server())
+        self.server_thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.server_thread.start()
+
+        self.interface = TableInterface(self.config)
+        self.interface.bot = FakeBot(self.server.sockets[0].getsockname()[1])
+
+    def tearDown(self):
+        with self.interface.join_lock:
+            self.interface.cancel_join_timer()
+        self.interface.bot.table_socket.close()
+        self.interface.logger.close()
+
+        asyncio.run_coroutine_threadsafe(self.stop_server(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.server_thread.join()
+        self.loop.close()
+
+    async def stop_server(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+        # The connection handler finishes once it reads the end of the closed table socket
+        await asyncio.gather(*(asyncio.all_tasks() - {asyncio.current_task()}))
+
+    def add_players(self, *names):
+        for name in names:
+            self.interface.handle_message(request('addPlayer', name), name)
+
+    def notified_players(self):
+        return [recipient for content, recipient in self.interface.bot.sent
+                if self.config.game_started_message in content]
+
+    def wait_for_notifications(self, count, timeout=2):
+        deadline = time() + timeout
+        while len(self.notified_players()) < count and time() < deadline:
+            sleep(0.01)
+
+    def table_status(self):
+        return self.interface.forward_to_table(request('status', 'Player1'))
+
+    def test_starts_when_player_count_is_reached(self):
+        self.config.join_deadline = 60
+        self.add_players('Player1', 'Player2')
+        self.assertEqual(self.notified_players(), [])
+
+        self.add_players('Player3')
+
+        self.assertTrue(self.interface.game_started)
+        self.assertEqual(self.notified_players(), ['Player1', 'Player2', 'Player3'])
+        self.assertNotIn('Start-State', self.table_status())
+
+    def test_starts_at_deadline_with_minimum_players(self):
+        self.add_players('Player1', 'Player2')
+        self.wait_for_notifications(2)
+
+        self.assertTrue(self.interface.game_started)
+        self.assertEqual(self.notified_players(), ['Player1', 'Player2'])
+
+    def test_does_not_start_below_minimum_players(self):
+        self.add_players('Player1')
+        sleep(self.config.join_deadline * 2)
+
+        self.assertFalse(self.interface.game_started)
+        self.assertEqual(self.notified_players(), [])
+        self.assertIn('Start-State', self.table_status())
+
+    def test_late_joiner_is_notified(self):
+        self.config.join_deadline = 60
+        self.add_players('Player1', 'Player2', 'Player3')
+        self.add_players('Player4')
+
+        self.assertEqual(self.notified_players(), ['Player1', 'Player2', 'Player3', 'Player4'])
+
+    def test_failed_start_restarts_deadline(self):
+        self.config.join_player_count = 1
+        self.config.join_deadline = 60
+        self.add_players('Player1')
+
+        # The table refuses to start with a single player
+        self.assertFalse(self.interface.game_started)
+        self.assertIsNotNone(self.interface.join_timer)
+        self.assertEqual(self.notified_players(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
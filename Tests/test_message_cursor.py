@@ -0,0 +1,188 @@
+import asyncio
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from Configuration.Configuration import Configuration
+from Configuration.Enums import BotMode
+from Tests.stubs import install_stubs
+
+install_stubs()
+
+from Bot.Bot import Bot
+from Group2Interface import Group2Interface, PrivateMessageReceiver
+from Interface import Interface
+
+CHANNEL_ID = 1
+
+
+def message(message_id, author='Player1', channel_id=CHANNEL_ID):
+    return SimpleNamespace(id=message_id, content=str(message_id), channel=SimpleNamespace(id=channel_id),
+                           author=SimpleNamespace(name=author))
+
+
+class FakeChannel:
+    """
+    Channel history that delivers live messages to the bot while it is iterated, like discord does during catch-up
+    """
+
+    def __init__(self, bot, messages, live_messages):
+        self.bot = bot
+        self.messages = messages
+        self.live_messages = live_messages
+
+    async def history(self, limit, after, oldest_first):
+        for msg in self.messages:
+            if msg.id <= after.id:
+                continue
+
+            if self.live_messages:
+                await self.bot.on_message(self.live_messages.pop(0))
+            yield msg
+
+
+class InterfaceCursorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.interface = Interface(Configuration(load_secrets=False))
+
+    def tearDown(self):
+        self.interface.logger.close()
+
+    def test_duplicates_are_ignored(self):
+        self.assertTrue(self.interface.message_received(10))
+        self.assertFalse(self.interface.message_received(10))
+
+        self.interface.message_handled(10)
+        self.assertFalse(self.interface.message_received(10))
+        self.assertFalse(self.interface.message_received(9))
+
+    def test_cursor_stops_at_oldest_pending_message(self):
+        for message_id in [10, 11, 12]:
+            self.interface.message_received(message_id)
+
+        self.interface.message_handled(12)
+        self.assertEqual(self.interface.get_session_state(), {'last_message_id': None, 'handled_message_ids': [12]})
+
+        self.interface.message_handled(10)
+        self.assertEqual(self.interface.get_session_state(), {'last_message_id': 10, 'handled_message_ids': [12]})
+
+        self.interface.message_handled(11)
+        self.assertEqual(self.interface.get_session_state(), {'last_message_id': 12, 'handled_message_ids': []})
+
+    def test_restored_state_skips_handled_messages(self):
+        self.interface.restore_session_state({'last_message_id': 10, 'handled_message_ids': [12]})
+
+        self.assertEqual([self.interface.message_received(i) for i in [10, 11, 12, 13]], [False, True, False, True])
+
+
+class BotCatchUpTest(unittest.TestCase):
+
+    def setUp(self):
+        self.config = Configuration(load_secrets=False)
+        self.config.secrets.text_channel_id = CHANNEL_ID
+        self.interface = Interface(self.config)
+
+        # Only the parts needed to receive messages, the real constructor connects to discord
+        self.bot = Bot.__new__(Bot)
+        self.bot.config = self.config
+        self.bot.interface = self.interface
+        self.bot.player_id = 'Table'
+        self.bot.bot_mode = BotMode.TABLE_MODE
+        self.bot.logger = self.interface.logger
+        self.bot.author_queues = {}
+        self.bot.executor = ThreadPoolExecutor(max_workers=self.config.max_concurrent_messages)
+        self.bot.message_semaphore = None
+        self.bot.caught_up = False
+        self.bot.buffered_messages = []
+
+        self.handled = []
+        self.handled_lock = threading.Lock()
+        self.bot.handle_received_message = self.record_message
+
+    def tearDown(self):
+        self.bot.executor.shutdown()
+        self.interface.logger.close()
+
+    def record_message(self, msg):
+        with self.handled_lock:
+            self.handled.append(msg.id)
+
+    async def catch_up(self, history, live_messages, last_message_id):
+        self.bot.loop = asyncio.get_running_loop()
+        channel = FakeChannel(self.bot, history, live_messages)
+        self.bot.get_channel = lambda channel_id: channel
+
+        await self.bot.on_ready()
+
+        while self.interface.last_message_id != last_message_id:
+            await asyncio.sleep(0.01)
+
+    def test_missed_and_live_messages_are_handled_once(self):
+        self.interface.restore_session_state({'last_message_id': 10, 'handled_message_ids': []})
+        history = [message(i) for i in [9, 10, 11, 12, 13]]
+
+        # 13 arrives live while the history is fetched and is contained in both, 14 is only received live
+        asyncio.run(asyncio.wait_for(self.catch_up(history, [message(13), message(14)], 14), 2))
+
+        self.assertEqual(self.handled, [11, 12, 13, 14])
+        self.assertEqual(self.bot.buffered_messages, [])
+        self.assertTrue(self.bot.caught_up)
+
+    def test_own_and_foreign_channel_messages_are_ignored(self):
+        self.interface.restore_session_state({'last_message_id': 10, 'handled_message_ids': []})
+        history = [message(11, author='Table'), message(12, channel_id=2), message(13)]
+
+        asyncio.run(asyncio.wait_for(self.catch_up(history, [], 13), 2))
+
+        self.assertEqual(self.handled, [13])
+
+
+class PrivateMessageReceiverTest(unittest.TestCase):
+
+    def setUp(self):
+        self.config = Configuration(load_secrets=False)
+        self.interface = Group2Interface(self.config)
+        self.sent = []
+        self.saves = []
+
+    def tearDown(self):
+        self.interface.logger.close()
+
+    def receive(self, bodies, cursor=None):
+        messages = [SimpleNamespace(created_utc=i, fullname='t4_' + str(i), subject='PokerSturm-Server', body=body,
+                                    mark_read=lambda: None) for i, body in enumerate(bodies)]
+        reddit = SimpleNamespace(inbox=SimpleNamespace(stream=lambda skip_existing: iter(messages)))
+        bot = SimpleNamespace(send_message=lambda content, recipient: self.sent.append((content, recipient)))
+
+        pmr = PrivateMessageReceiver(reddit, bot, 'Player1', self.interface.logger, cursor,
+                                     lambda: self.saves.append(list(pmr.cursor)))
+        pmr.run()
+        return pmr
+
+    def test_unknown_message_moves_cursor(self):
+        pmr = self.receive(['unknown', 'add received'])
+
+        self.assertEqual(self.sent, [('{"status" : "Success" , "message" : "Player added"}\n', 'Player1')])
+        self.assertEqual(self.saves, [[0, 't4_0'], [1, 't4_1']])
+        self.assertEqual(pmr.cursor, [1, 't4_1'])
+
+    def test_messages_before_cursor_are_skipped(self):
+        self.receive(['add received', 'remove received'], cursor=[0, 't4_0'])
+
+        self.assertEqual(self.sent, [('{"status" : "Success" , "message" : "Player removed"}\n', 'Player1')])
+
+    def test_restored_values_are_saved_before_receivers_start(self):
+        self.interface.restore_session_state({'last_message_id': 10, 'handled_message_ids': [], 'players': [],
+                                              'submissions': {'Player1': 'abc'},
+                                              'inbox_cursors': {'Player1': [1, 't4_1']}})
+
+        state = self.interface.get_session_state()
+
+        self.assertEqual(state['submissions'], {'Player1': 'abc'})
+        self.assertEqual(state['inbox_cursors'], {'Player1': [1, 't4_1']})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from Configuration.Configuration import Configuration
+from Configuration.Enums import LogLevel
+from Configuration.StructuredLogger import StructuredLogger
+
+
+class StructuredLoggerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+        self.config = Configuration(load_secrets=False)
+        self.config.log_file = Path(self.directory.name) / 'log.jsonl'
+        self.config.log_levels = {'table': LogLevel.WARNING}
+        self.config.log_sample_rates = {'status': 2}
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read_events(self):
+        with open(self.config.log_file, 'r') as f:
+            return [json.loads(line)['event'] for line in f]
+
+    def test_sample_key_is_only_evaluated_if_enabled(self):
+        logger = StructuredLogger(self.config)
+        evaluated = []
+
+        logger.info('table', 'dropped', sample_key=lambda: evaluated.append('table'))
+        for i in range(4):
+            logger.info('bot', 'sampled', sample_key=lambda: evaluated.append('bot') or 'status')
+        logger.close()
+
+        self.assertEqual(evaluated, ['bot'] * 4)
+        self.assertEqual(self.read_events(), ['sampled', 'sampled'])
+
+    def test_failing_record_does_not_stop_writer(self):
+        logger = StructuredLogger(self.config)
+
+        logger.info('bot', 'broken', content=lambda: 1 / 0)
+        logger.info('bot', 'written')
+        logger.close()
+
+        self.assertEqual(self.read_events(), ['written'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+import asyncio
+import json
+import random
+import unittest
+
+from Configuration.Configuration import Configuration
+from Server.TableServer import PokerTable, TableServer, hand_value
+
+
+class HandValueTest(unittest.TestCase):
+
+    def test_categories_are_ordered(self):
+        hands = [
+            ['2c', '5d', '9h', 'Js', 'Kc', '3d', '7h'],  # High card
+            ['2c', '2d', '9h', 'Js', 'Kc', '3d', '7h'],  # Pair
+            ['2c', '2d', '9h', '9s', 'Kc', '3d', '7h'],  # Two pair
+            ['2c', '2d', '2h', '9s', 'Kc', '3d', '7h'],  # Three of a kind
+            ['5c', '6d', '7h', '8s', '9c', '2d', 'Kh'],  # Straight
+            ['2h', '5h', '9h', 'Jh', 'Kh', '3d', '7c'],  # Flush
+            ['2c', '2d', '2h', '9s', '9c', '3d', '7h'],  # Full house
+            ['2c', '2d', '2h', '2s', 'Kc', '3d', '7h'],  # Four of a kind
+            ['5h', '6h', '7h', '8h', '9h', '2d', 'Kc'],  # Straight flush
+        ]
+
+        values = [hand_value(hand) for hand in hands]
+        self.assertEqual(values, sorted(values))
+        self.assertEqual([value[0] for value in values], list(range(9)))
+
+    def test_wheel_is_lowest_straight(self):
+        wheel = hand_value(['Ac', '2d', '3h', '4s', '5c', '9d', 'Jh'])
+        six_high = hand_value(['2d', '3h', '4s', '5c', '6c', '9d', 'Jh'])
+        trips = hand_value(['Ac', 'Ad', 'Ah', '4s', '9c', '7d', 'Jh'])
+
+        self.assertEqual(wheel[0], 4)
+        self.assertLess(wheel, six_high)
+        self.assertGreater(wheel, trips)
+
+    def test_kicker_decides(self):
+        ace_kicker = hand_value(['Kc', 'Kd', 'Ah', '7s', '5c', '3d', '2h'])
+        queen_kicker = hand_value(['Kh', 'Ks', 'Qh', '7s', '5c', '3d', '2h'])
+
+        self.assertGreater(ace_kicker, queen_kicker)
+
+
+class PokerTableTest(unittest.TestCase):
+
+    def setUp(self):
+        self.config = Configuration(load_secrets=False)
+
+    def play_hand(self, seed):
+        table = PokerTable(self.config, random.Random(seed))
+        for player in ['Player1', 'Player2', 'Player3']:
+            table.handle('addPlayer', player, '')
+        table.handle('start', 'Player1', '')
+
+        # Always take the first non folding action, so the course of the hand only depends on the cards
+        while table.state not in ['Winner-State', 'End-State']:
+            actions = table.handle('actions', table.current, '').split(',')
+            table.handle('call', table.current, 'allin' if actions[0] == 'none' else actions[1])
+
+        return table
+
+    def test_same_seed_same_deal(self):
+        first, second = self.play_hand(42), self.play_hand(42)
+
+        self.assertEqual(first.hands, second.hands)
+        self.assertEqual(first.community, second.community)
+        self.assertEqual(first.chips, second.chips)
+
+    def test_different_seed_different_deal(self):
+        self.assertNotEqual(self.play_hand(1).hands, self.play_hand(2).hands)
+
+    def test_chips_are_conserved(self):
+        table = self.play_hand(7)
+
+        self.assertEqual(sum(table.chips.values()) + table.pot, 3 * self.config.table_server_starting_chips)
+
+    def test_removing_last_opponent_ends_game(self):
+        table = PokerTable(self.config, random.Random(240))
+        for player in ['Player1', 'Player2']:
+            table.handle('addPlayer', player, '')
+        table.handle('start', 'Player1', '')
+
+        waiting = next(p for p in table.players if p != table.current)
+        table.handle('removePlayer', waiting, '')
+
+        self.assertEqual(table.state, 'End-State')
+
+
+class TableServerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.config = Configuration(load_secrets=False)
+        self.config.tcp_ip = '127.0.0.1'
+        self.config.tcp_port = 0
+
+    async def round_trip(self, requests):
+        server = await TableServer(self.config).start_server()
+        port = server.sockets[0].getsockname()[1]
+
+        reader, writer = await asyncio.open_connection(self.config.tcp_ip, port)
+        replies = []
+        for request in requests:
+            writer.write(request.encode())
+            await writer.drain()
+            replies.append(json.loads(await reader.readline()))
+
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return replies
+
+    def test_request_reply(self):
+        replies = asyncio.run(self.round_trip([
+            "{ 'method' : 'addPlayer' , 'name' : 'Player1' , 'action' : '' }\n",
+            "{ 'method' : 'addPlayer' , 'name' : 'Player1' , 'action' : '' }\n",
+            "{ 'method' : 'status' , 'name' : 'Player1' , 'action' : '' }\n",
+        ]))
+
+        self.assertEqual(replies, [
+            {'status': 'Success', 'message': 'Player added'},
+            {'status': 'Failure', 'message': 'Player already added'},
+            {'status': 'Success', 'message': 'Start-State'},
+        ])
+
+    def test_invalid_requests_fail(self):
+        replies = asyncio.run(self.round_trip([
+            'null\n',
+            '[1, 2]\n',
+            "{ 'method' : 42 , 'name' : 'Player1' , 'action' : '' }\n",
+            "{ 'method' : 'addPlayer' , 'name' : 'Player1' , 'action' : '' }\n",
+        ]))
+
+        self.assertEqual(replies, [
+            {'status': 'Failure', 'message': 'Invalid request'},
+            {'status': 'Failure', 'message': 'Invalid request'},
+            {'status': 'Failure', 'message': 'Invalid request'},
+            {'status': 'Success', 'message': 'Player added'},
+        ])
+
+    def test_reply_format(self):
+        reply = TableServer.handle_request(PokerTable(self.config, random.Random()), "{ 'method' : 'update' }")
+
+        self.assertEqual(reply, '{"status" : "Success" , "message" : "Updated"}\n')
+
+
+if __name__ == '__main__':
+    unittest.main()